@@ -40,6 +40,24 @@ class SidecarConfig(Confi):
         description="Timeout in seconds for control plane requests",
     )
 
+    CONTROL_PLANE_MAX_CONNECTIONS = confi.int(
+        "CONTROL_PLANE_MAX_CONNECTIONS",
+        100,
+        description="Max concurrent connections to the control plane for forwarded (facts) requests",
+    )
+
+    CONTROL_PLANE_MAX_KEEPALIVE_CONNECTIONS = confi.int(
+        "CONTROL_PLANE_MAX_KEEPALIVE_CONNECTIONS",
+        100,
+        description="Max idle connections kept open to the control plane for forwarded (facts) requests",
+    )
+
+    CONTROL_PLANE_KEEPALIVE_EXPIRY = confi.float(
+        "CONTROL_PLANE_KEEPALIVE_EXPIRY",
+        30,
+        description="Time in seconds an idle connection to the control plane is kept open for reuse",
+    )
+
     CONTROL_PLANE_PDP_DELTAS_API = confi.str(
         "CONTROL_PLANE_PDP_DELTAS_API",
         "http://localhost:8000",
@@ -272,6 +290,23 @@ class SidecarConfig(Confi):
         "ignore",
         description="The policy to use when the local facts wait timeout is reached. ",
     )
+    LOCAL_FACTS_MAX_PENDING_REQUESTS = confi.int(
+        "LOCAL_FACTS_MAX_PENDING_REQUESTS",
+        0,
+        description="Max facts requests waiting on the control plane at once, further requests are rejected "
+        "with 429, 0 for no limit",
+    )
+    LOCAL_FACTS_CIRCUIT_BREAKER_THRESHOLD = confi.int(
+        "LOCAL_FACTS_CIRCUIT_BREAKER_THRESHOLD",
+        0,
+        description="Number of consecutive failed (502/503/504 or connection error) facts requests to the control "
+        "plane after which facts requests are rejected right away, 0 to disable",
+    )
+    LOCAL_FACTS_CIRCUIT_BREAKER_RESET_TIMEOUT = confi.float(
+        "LOCAL_FACTS_CIRCUIT_BREAKER_RESET_TIMEOUT",
+        30,
+        description="The amount of time in seconds facts requests are rejected for, once the circuit breaker opened",
+    )
     VERSION_FILE_PATH = confi.str(
         "VERSION_FILE_PATH",
         "/permit_pdp_version",
@@ -2,10 +2,12 @@ import asyncio
 import json
 import re
 from pathlib import Path
-from typing import Annotated, cast
+from typing import Annotated, Any, cast
 
 import aiohttp
+import orjson
 from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse, ORJSONResponse
 from opal_client.config import opal_client_config
 from opal_client.logger import logger
 from opal_client.policy_store.base_policy_store_client import BasePolicyStoreClient
@@ -14,7 +16,6 @@ from opal_client.policy_store.policy_store_client_factory import (
 )
 from opal_client.utils import proxy_response
 from pydantic import parse_obj_as
-from starlette.responses import JSONResponse
 
 from horizon.authentication import enforce_pdp_token
 from horizon.config import sidecar_config
@@ -55,6 +56,9 @@ USER_PERMISSIONS_POLICY_PACKAGE = "permit.user_permissions"
 AUTHORIZED_USERS_POLICY_PACKAGE = "permit.authorized_users.authorized_users"
 USER_TENANTS_POLICY_PACKAGE = USER_PERMISSIONS_POLICY_PACKAGE + ".tenants"
 KONG_ROUTES_TABLE_FILE = "/config/kong_routes.json"
+# /health is hit by every liveness probe, its (static) bodies are serialized once
+HEALTH_OK_BODY = b'{"status":"ok"}'
+HEALTH_UNAVAILABLE_BODY = b'{"status":"unavailable"}'
 
 stats_manager = StatisticsManager(
     interval_seconds=sidecar_config.OPA_CLIENT_FAILURE_THRESHOLD_INTERVAL,
@@ -199,6 +203,14 @@ async def notify_seen_sdk(
     return x_permit_sdk_language
 
 
+def _dumps_opa_input(data: dict) -> bytes:
+    try:
+        return orjson.dumps(data)
+    except orjson.JSONEncodeError:
+        # orjson only supports 64-bit integers, the input may carry (user controlled) larger ones
+        return json.dumps(data).encode()
+
+
 async def post_to_opa(request: Request, path: str, data: dict | None):
     headers = transform_headers(request)
     url = f"{opal_client_config.POLICY_STORE_URL}/v1/data/{path}"
@@ -209,7 +221,7 @@ async def post_to_opa(request: Request, path: str, data: dict | None):
         async with aiohttp.ClientSession(trust_env=True) as session:  # noqa: SIM117
             async with session.post(
                 url,
-                data=json.dumps(data) if data is not None else None,
+                data=_dumps_opa_input(data) if data is not None else None,
                 headers=headers,
                 timeout=sidecar_config.OPA_CLIENT_QUERY_TIMEOUT,
                 raise_for_status=True,
@@ -248,6 +260,29 @@ def _set_use_debugger(data: dict | None) -> None:
         data["input"]["use_debugger"] = sidecar_config.IS_DEBUG_MODE
 
 
+def _exclude_none(value: Any) -> Any:
+    """drops None values from dicts at any depth, like jsonable_encoder(exclude_none=True) does"""
+    if isinstance(value, dict):
+        return {key: _exclude_none(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [_exclude_none(item) for item in value]
+    return value
+
+
+def _result_response(result: BaseSchema) -> JSONResponse:
+    """
+    serializes an already validated result straight to the response body, skipping FastAPI's
+    second validation against the route's response_model and its jsonable_encoder pass
+    (mirrors the routes' response_model_exclude_none=True, including None values nested in dict fields)
+    """
+    content = _exclude_none(result.dict())
+    try:
+        return ORJSONResponse(content)
+    except orjson.JSONEncodeError:
+        # orjson only supports 64-bit integers, the result may echo (user controlled) larger ones
+        return JSONResponse(content)
+
+
 async def _is_allowed(query: BaseSchema, request: Request, policy_package: str):
     opa_input = {"input": query.dict()}
     path = policy_package.replace(".", "/")
@@ -266,12 +301,13 @@ def init_enforcer_api_router(policy_store: BasePolicyStoreClient = None):  # noq
     @router.get("/health", status_code=status.HTTP_200_OK, include_in_schema=False)
     async def health():
         if await stats_manager.status():
-            return JSONResponse(
+            return Response(
+                content=HEALTH_UNAVAILABLE_BODY,
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                content={"status": "unavailable"},
+                media_type="application/json",
             )
 
-        return JSONResponse(status_code=status.HTTP_200_OK, content={"status": "ok"})
+        return Response(content=HEALTH_OK_BODY, status_code=status.HTTP_200_OK, media_type="application/json")
 
     @router.post(
         "/authorized_users",
@@ -310,44 +346,42 @@ def init_enforcer_api_router(policy_store: BasePolicyStoreClient = None):  # noq
     ):
         data = await post_to_opa(request, "mapping_rules", None)
 
-        mapping_rules = []
-        data_result = json.loads(data.body).get("result") or {}
-        mapping_rules_json = data_result.get("all") or []
-
-        for mapping_rule in mapping_rules_json:
-            mapping_rules.append(parse_obj_as(MappingRuleData, mapping_rule))
+        mapping_rules_json, mapping_rules = MappingRulesUtils.load_mapping_rules(data.body)
         matched_mapping_rule = MappingRulesUtils.extract_mapping_rule_by_request(
             mapping_rules, query.http_method, query.url
         )
         if matched_mapping_rule is None:
-            return {
-                "allow": False,
-                "result": False,
-                "query": query.dict(),
-                "debug": {
-                    "reason": "Matched mapping rule not found for the requested URL and HTTP method",
-                    "mapping_rules": mapping_rules_json,
-                },
-            }
+            return _result_response(
+                AuthorizationResult(
+                    allow=False,
+                    result=False,
+                    query=query.dict(),
+                    debug={
+                        "reason": "Matched mapping rule not found for the requested URL and HTTP method",
+                        "mapping_rules": mapping_rules_json,
+                    },
+                )
+            )
         # Extract attributes based on the mapping rule type
         if matched_mapping_rule.url_type == "regex":
             # For regex patterns, use only named capture groups
-            pattern = re.compile(matched_mapping_rule.url)
+            pattern = MappingRulesUtils.compile_url_pattern(matched_mapping_rule.url)
             match = pattern.match(query.url)
             path_attributes = match.groupdict() if match else {}
         else:
             # Use existing logic for traditional {var} style patterns
-            path_attributes = MappingRulesUtils.extract_attributes_from_url(matched_mapping_rule.url, query.url)
+            path_attributes = MappingRulesUtils.extract_attributes_from_url(matched_mapping_rule, query.url)
 
         # Query params handling remains the same for both types
         query_params_attributes = MappingRulesUtils.extract_attributes_from_query_params(
-            matched_mapping_rule.url, query.url
+            matched_mapping_rule, query.url
         )
         attributes = {**path_attributes, **query_params_attributes}
-        allowed_query = AuthorizationQuery(
+        # built only from the validated query and mapping rule, no need to validate it again
+        allowed_query = AuthorizationQuery.construct(
             user=query.user,
             action=matched_mapping_rule.action,
-            resource=Resource(
+            resource=Resource.construct(
                 type=matched_mapping_rule.resource,
                 tenant=query.tenant,
                 attributes=attributes,
@@ -445,20 +479,25 @@ def init_enforcer_api_router(policy_store: BasePolicyStoreClient = None):  # noq
         request: Request,
         queries: list[AuthorizationQuery],
     ):
-        bulk_query = BulkAuthorizationQuery(checks=queries)
+        # the checks were already validated by FastAPI, no need to validate them again
+        bulk_query = BulkAuthorizationQuery.construct(checks=queries)
         response = await _is_allowed(bulk_query, request, BULK_POLICY_PACKAGE)
         log_query_result(bulk_query, response)
         try:
             raw_result = json.loads(response.body).get("result", {})
-            return BulkAuthorizationResult(
-                allow=raw_result.get("allow", []),
+            return _result_response(
+                BulkAuthorizationResult(
+                    allow=raw_result.get("allow", []),
+                )
             )
         except Exception as e:  # noqa: BLE001
             logger.opt(exception=True).warning(
                 "is allowed (fallback response)", reason=f"cannot decode opa response: {e}"
             )
-            return BulkAuthorizationResult(
-                allow=[],
+            return _result_response(
+                BulkAuthorizationResult(
+                    allow=[],
+                )
             )
 
     @router.post(
@@ -486,17 +525,18 @@ def init_enforcer_api_router(policy_store: BasePolicyStoreClient = None):  # noq
         try:
             raw_result = json.loads(response.body).get("result", {})
             processed_query = get_v1_processed_query(raw_result) or get_v2_processed_query(raw_result) or {}
-            return {
-                "allow": raw_result.get("allow", False),
-                "result": raw_result.get("allow", False),  # fallback for older sdks (TODO: remove)
-                "query": processed_query,
-                "debug": raw_result.get("debug", {}),
-            }
+            result = AuthorizationResult(
+                allow=raw_result.get("allow", False),
+                result=raw_result.get("allow", False),  # fallback for older sdks (TODO: remove)
+                query=processed_query,
+                debug=raw_result.get("debug", {}),
+            )
         except Exception as e:  # noqa: BLE001
             logger.opt(exception=True).warning(
                 "is allowed (fallback response)", reason=f"cannot decode opa response: {e}"
             )
-            return {"allow": False, "result": False}
+            result = AuthorizationResult(allow=False, result=False)
+        return _result_response(result)
 
     @router.post(
         "/nginx_allowed",
@@ -523,17 +563,18 @@ def init_enforcer_api_router(policy_store: BasePolicyStoreClient = None):  # noq
         try:
             raw_result = json.loads(response.body).get("result", {})
             processed_query = get_v1_processed_query(raw_result) or get_v2_processed_query(raw_result) or {}
-            return {
-                "allow": raw_result.get("allow", False),
-                "result": raw_result.get("allow", False),  # fallback for older sdks (TODO: remove)
-                "query": processed_query,
-                "debug": raw_result.get("debug", {}),
-            }
+            result = AuthorizationResult(
+                allow=raw_result.get("allow", False),
+                result=raw_result.get("allow", False),  # fallback for older sdks (TODO: remove)
+                query=processed_query,
+                debug=raw_result.get("debug", {}),
+            )
         except Exception as e:  # noqa: BLE001
             logger.opt(exception=True).warning(
                 "is allowed (fallback response)", reason=f"cannot decode opa response: {e}"
             )
-            return {"allow": False, "result": False}
+            result = AuthorizationResult(allow=False, result=False)
+        return _result_response(result)
 
     @router.post(
         "/kong",
@@ -586,7 +627,7 @@ def init_enforcer_api_router(policy_store: BasePolicyStoreClient = None):  # noq
             }
 
         response = await _is_allowed(
-            KongWrappedAuthorizationQuery(
+            KongWrappedAuthorizationQuery.construct(
                 user={
                     "key": query.input.consumer.username,
                 },
@@ -664,10 +705,10 @@ def _extract_url_attributes(matched_rule: MappingRuleData, url: str) -> dict:
     if matched_rule.url_type == "regex":
         attributes.update(_extract_regex_attributes(matched_rule.url, url))
     else:
-        attributes.update(MappingRulesUtils.extract_attributes_from_url(matched_rule.url, url))
+        attributes.update(MappingRulesUtils.extract_attributes_from_url(matched_rule, url))
 
     # Extract query parameters (same for both types)
-    query_params = MappingRulesUtils.extract_attributes_from_query_params(matched_rule.url, url)
+    query_params = MappingRulesUtils.extract_attributes_from_query_params(matched_rule, url)
     if query_params:
         attributes.update(query_params)
 
@@ -1,3 +1,6 @@
+import os
+import shutil
+from functools import cache
 from pathlib import Path
 
 import jinja2
@@ -9,14 +12,38 @@ from horizon.startup.api_keys import get_env_api_key
 TEMPLATES_PATH = Path(__file__).parent.parent.parent / "static" / "templates"
 
 
+@cache
 def get_jinja_environment() -> jinja2.Environment:
-    return jinja2.Environment(loader=jinja2.FileSystemLoader(TEMPLATES_PATH))
+    # templates ship with the package and never change at runtime, so once a template was
+    # compiled there is no need to stat its source file again on every get_template()
+    return jinja2.Environment(loader=jinja2.FileSystemLoader(TEMPLATES_PATH), auto_reload=False)
 
 
 def persist_to_file(contents: str, path: str) -> str:
     path_obj = Path(path).expanduser()
+    try:
+        is_unchanged = path_obj.is_file() and path_obj.read_text() == contents
+    except (OSError, UnicodeDecodeError):
+        # can't compare with the existing file, just overwrite it
+        is_unchanged = False
+    if is_unchanged:
+        # avoid rewriting an identical file (and waking up anything watching it)
+        return str(path_obj)
     path_obj.parent.mkdir(parents=True, exist_ok=True)
-    path_obj.write_text(contents)
+    # write to a temp file in the same directory and rename it over the target,
+    # so readers (i.e: OPA) never observe a truncated or partially written file
+    tmp_path = path_obj.with_name(f"{path_obj.name}.tmp.{os.getpid()}")
+    try:
+        # the rendered files carry the API key, the temp file is only readable by us
+        with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+            f.write(contents)
+        if path_obj.exists():
+            # keep the permissions of the file being replaced, as an in-place write would
+            shutil.copymode(path_obj, tmp_path)
+        tmp_path.replace(path_obj)
+    finally:
+        # no-op once the temp file was renamed, never leave a copy of the token behind on failure
+        tmp_path.unlink(missing_ok=True)
     return str(path_obj)
 
 
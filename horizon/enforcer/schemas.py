@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+import sys
 from enum import Enum
 from typing import Any
+from urllib.parse import parse_qsl
 
-from pydantic import AnyHttpUrl, BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, validator
 
 
 class BaseSchema(BaseModel):
     class Config:
         orm_mode = True
         allow_population_by_field_name = True
+        # reuse already validated sub-models (e.g: the checks of a bulk query) instead of
+        # copying every nested model instance whenever it is passed into another schema
+        copy_on_model_validation = "none"
 
 
 class User(BaseSchema):
@@ -47,7 +52,7 @@ class BulkAuthorizationQuery(BaseSchema):
     checks: list[AuthorizationQuery]
 
     def __repr__(self) -> str:
-        return " | ".join([repr(query) for query in self.checks])
+        return " | ".join(repr(query) for query in self.checks)
 
 
 class UrlTypes(str, Enum):
@@ -64,11 +69,24 @@ class UrlAuthorizationQuery(BaseSchema):
 
     user: User
     http_method: str
-    url: AnyHttpUrl
+    url: str
     tenant: str
     context: dict[str, Any] | None = Field(default_factory=dict)
     sdk: str | None
 
+    @validator("url")
+    def validate_url_scheme(cls, value: str) -> str:  # noqa: N805
+        # the url is matched against the mapping rules as a plain string, so a full url parse
+        # (i.e: AnyHttpUrl) is wasted work - only make sure it is an http(s) url with a host.
+        # surrounding whitespace is stripped, like AnyHttpUrl did
+        value = value.strip()
+        scheme, separator, rest = value.partition("://")
+        if not separator or scheme.lower() not in ("http", "https"):
+            raise ValueError("URL scheme not permitted, expected an http or https url")
+        if not rest or rest[0] in "/?#":
+            raise ValueError("URL host invalid")
+        return value
+
 
 class UserTenantsQuery(BaseSchema):
     user: User
@@ -91,12 +109,12 @@ class AuthorizationResult(BaseSchema):
 
 
 class BulkAuthorizationResult(BaseSchema):
-    allow: list[AuthorizationResult] = []
+    allow: list[AuthorizationResult] = Field(default_factory=list)
 
 
 class _TenantDetails(BaseSchema):
     key: str
-    attributes: dict = {}
+    attributes: dict = Field(default_factory=dict)
 
 
 class _ResourceDetails(_TenantDetails):
@@ -119,7 +137,15 @@ class _AllTenantsAuthorizationResult(AuthorizationResult):
 
 
 class AllTenantsAuthorizationResult(BaseSchema):
-    allowed_tenants: list[_AllTenantsAuthorizationResult] = []
+    allowed_tenants: list[_AllTenantsAuthorizationResult] = Field(default_factory=list)
+
+
+def _template_attribute(part: str) -> str | None:
+    """the (interned) attribute name of a '{attribute}' url template part, None for a literal part"""
+    if len(part) >= 2 and part[0] == "{" and part[-1] == "}":
+        # attribute names become keys of every resource attributes dict built from a rule
+        return sys.intern(part[1:-1])
+    return None
 
 
 class MappingRuleData(BaseSchema):
@@ -129,11 +155,61 @@ class MappingRuleData(BaseSchema):
     action: str
     priority: int | None = None
     url_type: UrlTypes = UrlTypes.DEFAULT
+    _path_parts: tuple[str, ...] = PrivateAttr(default=())
+    _path_attributes: tuple[str | None, ...] = PrivateAttr(default=())
+    _query_string: str | None = PrivateAttr(default=None)
+    _query_params: dict[str, str] = PrivateAttr(default_factory=dict)
+    _query_attributes: dict[str, str] = PrivateAttr(default_factory=dict)
+
+    def __init__(self, **data: Any) -> None:
+        super().__init__(**data)
+        # the rule url is compared against every /allowed_url request, split it once up front
+        path, separator, query_string = self.url.partition("?")
+        self._path_parts = tuple(path.split("/"))
+        self._path_attributes = tuple(_template_attribute(part) for part in self._path_parts)
+        self._query_string = query_string if separator else None
+        # same parsing as starlette's QueryParams, the last value wins for repeated keys
+        self._query_params = dict(parse_qsl(query_string, keep_blank_values=True))
+        self._query_attributes = {
+            key: attribute
+            for key, value in self._query_params.items()
+            if (attribute := _template_attribute(value)) is not None
+        }
+
+    @validator("http_method")
+    def normalize_http_method(cls, value: str) -> str:  # noqa: N805
+        # normalized once when the rules are loaded, so matching doesn't lowercase it per request
+        return sys.intern(value.lower())
 
     @property
     def resource_action(self) -> str:
         return self.action or self.http_method
 
+    @property
+    def path_parts(self) -> tuple[str, ...]:
+        """the '/' separated parts of the url path"""
+        return self._path_parts
+
+    @property
+    def path_attributes(self) -> tuple[str | None, ...]:
+        """per path part, the attribute name of a '{attribute}' part or None for a literal part"""
+        return self._path_attributes
+
+    @property
+    def query_string(self) -> str | None:
+        """the query string of the url, None if the url has no '?'"""
+        return self._query_string
+
+    @property
+    def query_params(self) -> dict[str, str]:
+        """the parsed query string of the url"""
+        return self._query_params
+
+    @property
+    def query_attributes(self) -> dict[str, str]:
+        """query param key -> attribute name, for the '{attribute}' query param values"""
+        return self._query_attributes
+
 
 class AuthorizedUserAssignment(BaseSchema):
     user: str = Field(..., description="The user that is authorized")
@@ -162,7 +238,8 @@ class AuthorizedUsersResult(BaseSchema):
     @classmethod
     def empty(cls, resource: Resource) -> AuthorizedUsersResult:
         resource_key = "*" if resource.key is None else resource.key
-        return cls(
+        # the values are built from an already validated resource, skip validation
+        return cls.construct(
             resource=f"{resource.type}:{resource_key}",
             tenant=resource.tenant or "default",
             users={},
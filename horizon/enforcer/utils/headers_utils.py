@@ -1,4 +1,8 @@
 def get_case_insensitive(dictionary, key) -> str | None:
-    if isinstance(key, str):
-        return next((dictionary[k] for k in dictionary if k.lower() == key.lower()), None)
-    return dictionary.get(key, None)
+    if not isinstance(key, str):
+        return dictionary.get(key, None)
+    lowered_key = key.lower()
+    for k, value in dictionary.items():
+        if k.lower() == lowered_key:
+            return value
+    return None
@@ -1,122 +1,178 @@
 # TODO: change to use re2 in the future, currently not supported in alpine due to c++ library issues
 # import re2 as re  # use re2 instead of re for regex matching because it's simiplier and safer for user inputted regexes  # noqa: ERA001,E501
+import json
 import re
+from functools import lru_cache
 
 from loguru import logger
-from pydantic import AnyHttpUrl
+from pydantic import parse_obj_as
 from starlette.datastructures import QueryParams
 
 from horizon.enforcer.schemas import MappingRuleData, UrlTypes
 
+# mapping rules grouped by their (lowercased) http method and then by the number of url path parts,
+# each group ordered by priority. regex rules can match any path so they are part of every group,
+# and the None group (regex rules only) serves paths no default rule has the length of.
+MappingRulesByMethod = dict[str, dict[int | None, tuple[MappingRuleData, ...]]]
+
 
 class MappingRulesUtils:
     @staticmethod
-    def _compare_httpurls(mapping_rule_url: str, request_url: str) -> bool:
-        # Split URL into path and query parts
-        mapping_rule_parts = mapping_rule_url.split("?", 1)
-        request_parts = request_url.split("?", 1)
-        if not MappingRulesUtils._compare_url_path(mapping_rule_parts[0], request_parts[0]):
+    @lru_cache(maxsize=1024)
+    def compile_url_pattern(pattern: str) -> re.Pattern:
+        """
+        Compile a regex mapping rule URL, the same rules are matched on every request so
+        the compiled patterns are cached (bounded, as the rules are user controlled).
+        """
+        return re.compile(pattern)
+
+    # the last mapping rules returned by OPA and their parsed form, see load_mapping_rules
+    _last_mapping_rules: tuple[list[dict], MappingRulesByMethod] | None = None
+
+    @classmethod
+    def load_mapping_rules(cls, raw_mapping_rules: bytes) -> tuple[list[dict], MappingRulesByMethod]:
+        """
+        Parse the mapping rules returned by OPA into MappingRuleData objects.
+        The rules only change on policy/data updates, so the parsed rules (with their pre-split urls)
+        are reused for as long as OPA keeps returning the same rules. The raw response can't be used as
+        the cache key, with decision logs enabled it carries a unique decision_id per query.
+        Returns the raw rules (for debug output) alongside the parsed ones, both must not be mutated.
+        The parsed rules are grouped by http method and path length (see MappingRulesByMethod),
+        and ordered by priority within each group (highest first, stable for equal priorities).
+        """
+        # not orjson, it turns integers outside the 64-bit range into floats and the rules are echoed in debug output
+        data_result = json.loads(raw_mapping_rules).get("result") or {}
+        mapping_rules_json = data_result.get("all") or []
+        last_mapping_rules = cls._last_mapping_rules
+        if last_mapping_rules is not None and last_mapping_rules[0] == mapping_rules_json:
+            return last_mapping_rules
+
+        mapping_rules = [parse_obj_as(MappingRuleData, rule) for rule in mapping_rules_json]
+        # most priority first
+        mapping_rules.sort(key=lambda rule: rule.priority or 0, reverse=True)
+        mapping_rules_by_method: dict[str, list[MappingRuleData]] = {}
+        for mapping_rule in mapping_rules:
+            mapping_rules_by_method.setdefault(mapping_rule.http_method, []).append(mapping_rule)
+        cls._last_mapping_rules = (
+            mapping_rules_json,
+            {method: cls._group_by_path_length(rules) for method, rules in mapping_rules_by_method.items()},
+        )
+        return cls._last_mapping_rules
+
+    @staticmethod
+    def _group_by_path_length(
+        mapping_rules: list[MappingRuleData],
+    ) -> dict[int | None, tuple[MappingRuleData, ...]]:
+        """
+        A default rule only matches urls with the same number of path parts, group the (priority ordered)
+        rules by that length so a request is only compared against the rules that can match it.
+        """
+        path_lengths = {
+            len(mapping_rule.path_parts) for mapping_rule in mapping_rules if mapping_rule.url_type is UrlTypes.DEFAULT
+        }
+        return {
+            path_length: tuple(
+                mapping_rule
+                for mapping_rule in mapping_rules
+                if mapping_rule.url_type is not UrlTypes.DEFAULT or len(mapping_rule.path_parts) == path_length
+            )
+            for path_length in (*path_lengths, None)
+        }
+
+    @staticmethod
+    def _compare_httpurls(
+        mapping_rule: MappingRuleData, request_path_parts: list[str], request_query_string: str | None
+    ) -> bool:
+        if not MappingRulesUtils._compare_url_path(mapping_rule, request_path_parts):
             return False
         # Compare query parameters if they exist
-        if len(mapping_rule_parts) > 1 and len(request_parts) > 1:
-            return MappingRulesUtils._compare_query_params(mapping_rule_parts[1], request_parts[1])
-        elif len(mapping_rule_parts) > 1:
+        if mapping_rule.query_string is not None and request_query_string is not None:
+            return MappingRulesUtils._compare_query_params(mapping_rule, request_query_string)
+        elif mapping_rule.query_string is not None:
             return False
         return True
 
     @staticmethod
-    def _compare_url_path(mapping_rule_url: str | None, request_url: str | None) -> bool:
-        if mapping_rule_url is None or request_url is None:
-            return mapping_rule_url is None and request_url is None
-
-        mapping_rule_url_parts = mapping_rule_url.split("/")
-        request_url_parts = request_url.split("/")
-
-        if len(mapping_rule_url_parts) != len(request_url_parts):
+    def _compare_url_path(mapping_rule: MappingRuleData, request_path_parts: list[str]) -> bool:
+        if len(mapping_rule.path_parts) != len(request_path_parts):
             return False
 
         return all(
-            (part.startswith("{") and part.endswith("}")) or part == req_part
-            for part, req_part in zip(mapping_rule_url_parts, request_url_parts, strict=False)
+            attribute is not None or part == req_part
+            for part, attribute, req_part in zip(
+                mapping_rule.path_parts, mapping_rule.path_attributes, request_path_parts, strict=True
+            )
         )
 
     @staticmethod
-    def _compare_query_params(mapping_rule_query_string: str | None, request_url_query_string: str | None) -> bool:
-        if mapping_rule_query_string is None and request_url_query_string is None:
-            # if both are None, they are equal
-            return True
-        if mapping_rule_query_string is not None and request_url_query_string is None:
-            # if the request query string is None, but the mapping rule query string is not
-            # then the request does not match the mapping rule
-            return False
-        if mapping_rule_query_string is None and request_url_query_string is not None:
-            # if the mapping rule query string is None, but the request query string is not
-            # then the request matches the query string rules it has additional data to the rule
+    def _compare_query_params(mapping_rule: MappingRuleData, request_url_query_string: str) -> bool:
+        if mapping_rule.query_string == request_url_query_string:
+            # identical query strings always match, no need to parse the request query string
             return True
 
-        mapping_rule_query_params = QueryParams(mapping_rule_query_string)
         request_query_params = QueryParams(request_url_query_string)
 
-        for key in mapping_rule_query_params:
+        for key, value in mapping_rule.query_params.items():
             if key not in request_query_params:
                 return False
 
-            if mapping_rule_query_params[key].startswith("{") and mapping_rule_query_params[key].endswith("}"):
+            if key in mapping_rule.query_attributes:
                 # if the value is an attribute
                 # we just need to make sure the attribute is in the request query params
                 continue
-            elif mapping_rule_query_params[key] != request_query_params[key]:
+            elif value != request_query_params[key]:
                 # if the value is not an attribute, verify that the values are the same
                 return False
         return True
 
     @staticmethod
-    def extract_attributes_from_url(rule_url: str, request_url: str) -> dict:
-        rule_url_parts = rule_url.split("/")
-        request_url_parts = request_url.split("/")
-        attributes = {}
-        if len(rule_url_parts) != len(request_url_parts):
+    def extract_attributes_from_url(mapping_rule: MappingRuleData, request_url: str) -> dict:
+        request_path_parts = request_url.partition("?")[0].split("/")
+        if len(mapping_rule.path_parts) != len(request_path_parts):
             return {}
-        for i in range(len(rule_url_parts)):
-            if rule_url_parts[i].startswith("{") and rule_url_parts[i].endswith("}"):
-                attributes[rule_url_parts[i][1:-1]] = request_url_parts[i]
-        return attributes
+        return {
+            attribute: req_part
+            for attribute, req_part in zip(mapping_rule.path_attributes, request_path_parts, strict=True)
+            if attribute is not None
+        }
 
     @staticmethod
-    def extract_attributes_from_query_params(rule_url: str, request_url: str) -> dict:
-        if "?" not in rule_url or "?" not in request_url:
+    def extract_attributes_from_query_params(mapping_rule: MappingRuleData, request_url: str) -> dict:
+        _, separator, request_query_string = request_url.partition("?")
+        if mapping_rule.query_string is None or not separator:
             return {}
-        rule_query_params = QueryParams(rule_url.split("?")[1])
-        request_query_params = QueryParams(request_url.split("?")[1])
-        attributes = {}
-        for key in rule_query_params:
-            if rule_query_params[key].startswith("{") and rule_query_params[key].endswith("}"):
-                attributes[rule_query_params[key][1:-1]] = request_query_params[key]
-        return attributes
+        request_query_params = QueryParams(request_query_string)
+        return {attribute: request_query_params[key] for key, attribute in mapping_rule.query_attributes.items()}
 
     @classmethod
-    def _compare_urls(cls, mapping_rule_url: str, request_url: str, *, is_regex: bool = False) -> bool:
+    def _compare_urls(
+        cls,
+        mapping_rule: MappingRuleData,
+        request_url: str,
+        request_path_parts: list[str],
+        request_query_string: str | None,
+    ) -> bool:
         """
-        Compare a mapping rule URL against a request URL.
+        Compare a mapping rule URL against a request URL (already split into path parts and query string).
         """
         # If the mapping rule is a regex pattern
-        if is_regex:
+        if mapping_rule.url_type is UrlTypes.REGEX:
             try:
-                pattern = re.compile(mapping_rule_url)
+                pattern = cls.compile_url_pattern(mapping_rule.url)
                 match_result = bool(pattern.match(request_url))
-                logger.debug("regex url comparison", pattern=mapping_rule_url, url=request_url, matched=match_result)
+                logger.debug("regex url comparison", pattern=mapping_rule.url, url=request_url, matched=match_result)
                 return match_result
             except re.error as e:
-                logger.warning("regex pattern compilation failed", pattern=mapping_rule_url, error=str(e))
+                logger.warning("regex pattern compilation failed", pattern=mapping_rule.url, error=str(e))
                 return False
 
         # For traditional URL matching
         try:
-            return cls._compare_httpurls(mapping_rule_url, request_url)
+            return cls._compare_httpurls(mapping_rule, request_path_parts, request_query_string)
         except Exception as e:  # noqa: BLE001
             logger.warning(
                 "URL comparison failed - verify URL format and structure",
-                mapping_url=mapping_rule_url,
+                mapping_url=mapping_rule.url,
                 request_url=request_url,
                 error_message=str(e),
                 error_type=type(e).__name__,
@@ -126,15 +182,25 @@ class MappingRulesUtils:
     @classmethod
     def extract_mapping_rule_by_request(
         cls,
-        mapping_rules: list[MappingRuleData],
+        mapping_rules: MappingRulesByMethod,
         http_method: str,
-        url: AnyHttpUrl,
+        url: str,
     ) -> MappingRuleData | None:
-        matched_mapping_rules = []
-        http_method = http_method.lower()  # Convert once instead of in each iteration
-
-        for mapping_rule in mapping_rules:
-            is_regex = mapping_rule.url_type == UrlTypes.REGEX
+        """
+        Find the mapping rule matching the request, mapping_rules must be grouped and ordered by priority
+        as returned by load_mapping_rules, so the first match is the most prioritized one.
+        """
+        http_method = http_method.lower()
+        # Split the request url once, the mapping rules urls are already split
+        request_path, separator, request_query_string = url.partition("?")
+        request_path_parts = request_path.split("/")
+        request_query = request_query_string if separator else None
+
+        # only the rules of the request method and path length (or regex rules) are candidates
+        rules_by_path_length = mapping_rules.get(http_method, {})
+        candidates = rules_by_path_length.get(len(request_path_parts)) or rules_by_path_length.get(None, ())
+        for mapping_rule in candidates:
+            is_regex = mapping_rule.url_type is UrlTypes.REGEX
 
             logger.debug(
                 "checking mapping rule",
@@ -146,19 +212,7 @@ class MappingRulesUtils:
                 is_regex=is_regex,
             )
 
-            # Check method first as it's cheaper than URL comparison
-            if mapping_rule.http_method.lower() != http_method:
-                # if the method is not the same, we don't need to check the url
-                continue
-
-            if not cls._compare_urls(mapping_rule.url, url, is_regex=is_regex):
-                continue
-
-            matched_mapping_rules.append(mapping_rule)
-
-        # most priority first
-        matched_mapping_rules.sort(key=lambda rule: rule.priority or 0, reverse=True)
-        if len(matched_mapping_rules) > 0:
-            return matched_mapping_rules[0]
+            if cls._compare_urls(mapping_rule, url, request_path_parts, request_query):
+                return mapping_rule
 
         return None
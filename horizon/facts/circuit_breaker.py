@@ -0,0 +1,33 @@
+from time import monotonic
+
+
+class CircuitBreaker:
+    """
+    Fails fast while an upstream keeps failing, instead of having every request wait for the full timeout.
+
+    The circuit opens after `failure_threshold` consecutive failures, and rejects requests for `reset_timeout`
+    seconds. Once that passes requests are let through again, the first success closes the circuit and any
+    failure re-opens it. A `failure_threshold` of 0 disables the breaker.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None and monotonic() - self._opened_at < self._reset_timeout
+
+    def allow_request(self) -> bool:
+        return not self.is_open
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._failure_threshold and self._failures >= self._failure_threshold:
+            self._opened_at = monotonic()
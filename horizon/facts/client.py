@@ -1,28 +1,39 @@
 from typing import Annotated, Any
-from urllib.parse import urljoin
 
 from fastapi import Depends, HTTPException
-from httpx import AsyncClient
+from httpx import AsyncClient, Limits, TransportError
 from httpx import Request as HttpxRequest
 from httpx import Response as HttpxResponse
 from loguru import logger
 from starlette import status
+from starlette.background import BackgroundTask
 from starlette.requests import Request as FastApiRequest
 from starlette.responses import Response as FastApiResponse
 from starlette.responses import StreamingResponse
 
 from horizon.config import sidecar_config
+from horizon.facts.circuit_breaker import CircuitBreaker
 from horizon.startup.api_keys import get_env_api_key
 from horizon.startup.remote_config import get_remote_config
 
 CONSISTENT_UPDATE_HEADER = "X-Permit-Consistent-Update"
 # Backend compares this value case-sensitively (`value == "true"`); keep coupled to the header name.
 CONSISTENT_UPDATE_HEADER_VALUE = "true"
+# responses that mean the facts service itself is unavailable (unlike i.e: a 500 caused by a bad payload)
+UPSTREAM_UNAVAILABLE_STATUS_CODES = frozenset((502, 503, 504))
+# the only client headers passed on to the facts service
+FORWARDED_HEADERS = ("authorization", "content-type")
 
 
 class FactsClient:
     def __init__(self):
         self._client: AsyncClient | None = None
+        self._circuit_breaker = CircuitBreaker(
+            failure_threshold=sidecar_config.LOCAL_FACTS_CIRCUIT_BREAKER_THRESHOLD,
+            reset_timeout=sidecar_config.LOCAL_FACTS_CIRCUIT_BREAKER_RESET_TIMEOUT,
+        )
+        self._pending_requests = 0
+        self._facts_path_prefix: str | None = None
 
     @property
     def client(self) -> AsyncClient:
@@ -31,11 +42,39 @@ class FactsClient:
             self._client = AsyncClient(
                 base_url=sidecar_config.CONTROL_PLANE,
                 timeout=sidecar_config.CONTROL_PLANE_TIMEOUT,
+                # every forwarded facts request goes to the same host, keep enough idle connections around
+                # (and for long enough) to reuse them instead of paying a new TCP+TLS handshake per request
+                limits=Limits(
+                    max_connections=sidecar_config.CONTROL_PLANE_MAX_CONNECTIONS,
+                    max_keepalive_connections=sidecar_config.CONTROL_PLANE_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=sidecar_config.CONTROL_PLANE_KEEPALIVE_EXPIRY,
+                ),
                 headers={"Authorization": f"Bearer {env_api_key}"},
                 trust_env=True,
             )
         return self._client
 
+    @property
+    def facts_path_prefix(self) -> str:
+        """the facts service path of the PDP's environment, built once as the remote config doesn't change"""
+        if self._facts_path_prefix is None:
+            remote_config = get_remote_config()
+            project_id = remote_config.context.get("project_id")
+            environment_id = remote_config.context.get("env_id")
+            if project_id is None or environment_id is None:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="PDP API Key for environment is required.",
+                )
+            self._facts_path_prefix = f"/v2/facts/{project_id}/{environment_id}/"
+        return self._facts_path_prefix
+
+    async def aclose(self) -> None:
+        """closes the pooled connections to the control plane (if the client was ever used)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
     async def build_forward_request(
         self,
         request: FastApiRequest,
@@ -53,20 +92,13 @@ class FactsClient:
         :return: HTTPX request
         """
         forward_headers = {
-            key: value for key, value in request.headers.items() if key.lower() in {"authorization", "content-type"}
+            header: value for header in FORWARDED_HEADERS if (value := request.headers.get(header)) is not None
         }
         if is_consistent_update:
             forward_headers[CONSISTENT_UPDATE_HEADER] = CONSISTENT_UPDATE_HEADER_VALUE
-        remote_config = get_remote_config()
-        project_id = remote_config.context.get("project_id")
-        environment_id = remote_config.context.get("env_id")
-        if project_id is None or environment_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="PDP API Key for environment is required.",
-            )
-
-        full_path = urljoin(f"/v2/facts/{project_id}/{environment_id}/", path.removeprefix("/"))
+        # the path is always relative to the environment's facts path (unlike urljoin, an absolute url in the
+        # path can't point the request, and the PDP's API key, to another host)
+        full_path = self.facts_path_prefix + path.removeprefix("/")
         _query_params = {**request.query_params, **(query_params or {})}
         return self.client.build_request(
             method=request.method,
@@ -77,8 +109,34 @@ class FactsClient:
         )
 
     async def send(self, request: HttpxRequest, *, stream: bool = False) -> HttpxResponse:
+        if not self._circuit_breaker.allow_request():
+            logger.warning(f"Facts service is failing, rejecting facts request: {request.method} {request.url}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Facts service is unavailable, try again later.",
+            )
+        max_pending_requests = sidecar_config.LOCAL_FACTS_MAX_PENDING_REQUESTS
+        if max_pending_requests and self._pending_requests >= max_pending_requests:
+            # bound the requests piling up behind the connection pool, instead of queueing them until they time out
+            logger.warning(f"Too many pending facts requests, rejecting facts request: {request.method} {request.url}")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many pending facts requests, try again later.",
+            )
         logger.info(f"Forwarding facts request: {request.method} {request.url}")
-        return await self.client.send(request, stream=stream)
+        self._pending_requests += 1
+        try:
+            response = await self.client.send(request, stream=stream)
+        except TransportError:
+            self._circuit_breaker.record_failure()
+            raise
+        finally:
+            self._pending_requests -= 1
+        if response.status_code in UPSTREAM_UNAVAILABLE_STATUS_CODES:
+            self._circuit_breaker.record_failure()
+        else:
+            self._circuit_breaker.record_success()
+        return response
 
     async def send_forward_request(
         self,
@@ -114,16 +172,23 @@ class FactsClient:
         """
         if stream or not hasattr(response, "_content"):
             # if the response content has not loaded yet, optimize it to stream the response.
+            # the upstream headers (i.e: content-encoding) are forwarded as is, so pipe the raw bytes
+            # without decoding them, and release the upstream connection even if the client disconnects.
             return StreamingResponse(
-                content=response.aiter_bytes(),
+                content=response.aiter_raw(),
                 status_code=response.status_code,
                 headers=response.headers,
+                background=BackgroundTask(response.aclose),
             )
         else:
+            # the loaded content is already decoded, so the upstream encoding and length no longer apply
+            headers = response.headers.copy()
+            headers.pop("content-encoding", None)
+            headers.pop("content-length", None)
             return FastApiResponse(
                 content=response.content,
                 status_code=response.status_code,
-                headers=response.headers,
+                headers=headers,
             )
 
     @staticmethod
@@ -38,10 +38,8 @@ def create_data_source_entry(
     update_id: UUID,
 ) -> DataSourceEntry:
     obj_id = obj_id.replace("-", "")  # convert UUID to Hex
-    url = urljoin(
-        get_opal_data_base_url(),
-        f"{obj_type}/{obj_id}",
-    )
+    # the base url always ends with a "/", no need to parse it again (urljoin) for every entry
+    url = f"{get_opal_data_base_url()}{obj_type}/{obj_id}"
 
     topic = get_opal_data_topic()
 
@@ -52,13 +50,14 @@ def create_data_source_entry(
     if sidecar_config.SHARD_ID:
         headers["X-Shard-Id"] = sidecar_config.SHARD_ID
 
-    return DataSourceEntry(
+    # built once per written object from values we generated ourselves, skip pydantic validation
+    return DataSourceEntry.construct(
         url=url,
         data=None,
         dst_path=f"{obj_type}/{obj_key}",
         save_method="PUT",
         topics=[topic],
-        config=HttpFetcherConfig(headers=headers).dict(),
+        config=HttpFetcherConfig.construct(headers=headers).dict(),
     )
 
 
@@ -33,6 +33,7 @@ from horizon.enforcer.opa.config_maker import (
     get_opa_authz_policy_file_path,
     get_opa_config_file_path,
 )
+from horizon.facts.client import get_facts_client
 from horizon.facts.router import facts_router
 from horizon.local.api import init_local_cache_api_router
 from horizon.opal_relay_api import OpalRelayAPIClient
@@ -383,6 +384,8 @@ class PermitPDP:
         # Init api routers with required dependencies
         app.on_event("startup")(stats_manager.run)
         app.on_event("shutdown")(stats_manager.stop_tasks)
+        # release the facts client's pooled control plane connections instead of leaking them on worker restarts
+        app.on_event("shutdown")(get_facts_client().aclose)
 
         enforcer_router = init_enforcer_api_router(policy_store=self._opal.policy_store)
         local_router = init_local_cache_api_router(policy_store=self._opal.policy_store)
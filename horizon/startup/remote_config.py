@@ -120,8 +120,11 @@ _remote_config: RemoteConfig | None = None
 
 def get_remote_config():
     global _remote_config
-    if _remote_config is None:
-        _remote_config = RemoteConfigFetcher().fetch_config()
+    if _remote_config is not None:
+        # called on every forwarded facts request, the config (and its offline backup) never changes once fetched
+        return _remote_config
+
+    _remote_config = RemoteConfigFetcher().fetch_config()
 
     if sidecar_config.ENABLE_OFFLINE_MODE:
         offline_mode = OfflineModeManager(
@@ -0,0 +1,34 @@
+from pathlib import Path
+
+import pytest
+from horizon.enforcer.opa.config_maker import persist_to_file
+
+
+def test_persist_to_file_overwrites_undecodable_file(tmp_path: Path):
+    target = tmp_path / "config.yaml"
+    target.write_bytes(b"\xff\xfe\xfa")
+
+    assert persist_to_file("contents", str(target)) == str(target)
+    assert target.read_text() == "contents"
+
+
+def test_persist_to_file_keeps_the_target_mode(tmp_path: Path):
+    target = tmp_path / "config.yaml"
+    target.write_text("old contents")
+    target.chmod(0o600)
+
+    persist_to_file("new contents", str(target))
+
+    assert target.read_text() == "new contents"
+    assert target.stat().st_mode & 0o777 == 0o600
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_persist_to_file_removes_temp_file_on_failure(tmp_path: Path):
+    target = tmp_path / "config.yaml"
+    (target / "not-empty").mkdir(parents=True)  # can't be replaced by a file
+
+    with pytest.raises(OSError):
+        persist_to_file("contents", str(target))
+
+    assert list(tmp_path.iterdir()) == [target]
@@ -868,3 +868,137 @@ def test_enforce_endpoint(
         response = post_endpoint()
         assert response.status_code == 504
         assert "OPA request timed out" in response.text
+
+
+@pytest.mark.parametrize(
+    "url", ["ftp://api.example.com/users", "api.example.com/users", "http://", "https:///users", " http:// "]
+)
+def test_allowed_url_rejects_non_http_urls(url: str):
+    _client = TestClient(sidecar._app)
+    response = _client.post(
+        "/allowed_url",
+        headers={"authorization": f"Bearer {sidecar_config.API_KEY}"},
+        json={"user": {"key": "user1"}, "http_method": "GET", "url": url, "tenant": "default"},
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_allowed_url_strips_surrounding_whitespace():
+    query = UrlAuthorizationQuery(
+        user={"key": "user1"}, http_method="GET", url=" https://api.example.com/users/1\n", tenant="default"
+    )
+    assert query.url == "https://api.example.com/users/1"
+
+
+def test_allowed_response_body():
+    _client = TestClient(sidecar._app)
+    with aioresponses() as m:
+        m.post(
+            f"{opal_client_config.POLICY_STORE_URL}/v1/data/permit/root",
+            status=200,
+            payload={"result": {"allow": True, "debug": {"reason": None, "rbac": {"allow": True, "role": None}}}},
+        )
+        response = _client.post(
+            "/allowed",
+            headers={"authorization": f"Bearer {sidecar_config.API_KEY}"},
+            json={"user": {"key": "user1"}, "action": "read", "resource": {"type": "resource1"}},
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    # None values are dropped at any depth (response_model_exclude_none)
+    assert response.json() == {"allow": True, "query": {}, "debug": {"rbac": {"allow": True}}, "result": True}
+
+
+def test_allowed_url_no_matching_rule_response_body():
+    _client = TestClient(sidecar._app)
+    mapping_rule = {"url": "https://some.url/resource", "http_method": "get", "resource": "r", "action": "read"}
+    with aioresponses() as m:
+        m.post(
+            f"{opal_client_config.POLICY_STORE_URL}/v1/data/mapping_rules",
+            status=200,
+            payload={"result": {"all": [{**mapping_rule, "priority": None}]}},
+        )
+        response = _client.post(
+            "/allowed_url",
+            headers={"authorization": f"Bearer {sidecar_config.API_KEY}"},
+            json={"user": {"key": "user1"}, "http_method": "DELETE", "url": "https://some.url/other", "tenant": "t1"},
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "allow": False,
+        "query": {
+            "user": {"key": "user1", "attributes": {}},
+            "http_method": "DELETE",
+            "url": "https://some.url/other",
+            "tenant": "t1",
+            "context": {},
+        },
+        "debug": {
+            "reason": "Matched mapping rule not found for the requested URL and HTTP method",
+            "mapping_rules": [mapping_rule],
+        },
+        "result": False,
+    }
+
+
+def test_allowed_with_big_integer_attribute():
+    _client = TestClient(sidecar._app)
+    opa_url = f"{opal_client_config.POLICY_STORE_URL}/v1/data/permit/root"
+    with aioresponses() as m:
+        m.post(opa_url, status=200, payload={"result": {"allow": True}})
+        response = _client.post(
+            "/allowed",
+            headers={"authorization": f"Bearer {sidecar_config.API_KEY}"},
+            json={
+                "user": {"key": "user1", "attributes": {"big": 123456789012345678901234567890}},
+                "action": "read",
+                "resource": {"type": "resource1"},
+            },
+        )
+        (opa_request,) = next(iter(m.requests.values()))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert b"123456789012345678901234567890" in opa_request.kwargs["data"]
+
+
+def test_allowed_url_no_matching_rule_with_big_integer_attribute():
+    _client = TestClient(sidecar._app)
+    with aioresponses() as m:
+        m.post(
+            f"{opal_client_config.POLICY_STORE_URL}/v1/data/mapping_rules",
+            status=200,
+            payload={"result": {"all": []}},
+        )
+        response = _client.post(
+            "/allowed_url",
+            headers={"authorization": f"Bearer {sidecar_config.API_KEY}"},
+            json={
+                "user": {"key": "user1", "attributes": {"big": 123456789012345678901234567890}},
+                "http_method": "GET",
+                "url": "https://some.url/resource",
+                "tenant": "default",
+            },
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["query"]["user"]["attributes"] == {"big": 123456789012345678901234567890}
+
+
+def test_allowed_keeps_big_integers_from_opa():
+    _client = TestClient(sidecar._app)
+    with aioresponses() as m:
+        m.post(
+            f"{opal_client_config.POLICY_STORE_URL}/v1/data/permit/root",
+            status=200,
+            payload={"result": {"allow": True, "debug": {"big": 123456789012345678901234567890}}},
+        )
+        response = _client.post(
+            "/allowed",
+            headers={"authorization": f"Bearer {sidecar_config.API_KEY}"},
+            json={"user": {"key": "user1"}, "action": "read", "resource": {"type": "resource1"}},
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["debug"] == {"big": 123456789012345678901234567890}
+    assert b"123456789012345678901234567890" in response.content
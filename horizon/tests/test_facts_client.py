@@ -1,7 +1,14 @@
+import gzip
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from fastapi import HTTPException
+from horizon.config import sidecar_config
+from horizon.facts.circuit_breaker import CircuitBreaker
 from horizon.facts.client import CONSISTENT_UPDATE_HEADER, FactsClient
+from httpx import ByteStream
+from httpx import Request as HttpxRequest
+from httpx import Response as HttpxResponse
 from starlette.requests import Request as FastApiRequest
 
 
@@ -79,3 +86,78 @@ async def test_send_forward_request_propagates_consistent_update_kwarg():
         assert mock_send.call_args is not None
         sent_request = mock_send.call_args.args[0]
         assert sent_request.headers.get("X-Permit-Consistent-Update") == "true"
+
+
+@pytest.mark.asyncio
+async def test_convert_response_streams_raw_body():
+    """Streamed responses keep the upstream content-encoding, so the body must be forwarded undecoded."""
+    compressed = gzip.compress(b'{"key": "user1"}')
+    response = HttpxResponse(200, headers={"content-encoding": "gzip"}, stream=ByteStream(compressed))
+
+    streaming_response = FactsClient.convert_response(response, stream=True)
+
+    body = b"".join([chunk async for chunk in streaming_response.body_iterator])
+    assert body == compressed
+    assert streaming_response.headers["content-encoding"] == "gzip"
+
+
+@pytest.mark.asyncio
+async def test_send_fails_fast_after_consecutive_server_errors():
+    """Once the circuit breaker opens, facts requests are rejected without reaching the control plane."""
+    client = FactsClient()
+    client._circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    request = HttpxRequest("GET", "http://control-plane/v2/facts/proj1/env1/users")
+    mock_httpx_client = MagicMock()
+    mock_httpx_client.send = AsyncMock()
+    client._client = mock_httpx_client
+
+    # errors caused by the request itself don't count as failures
+    mock_httpx_client.send.return_value = HttpxResponse(500)
+    for _ in range(3):
+        assert (await client.send(request)).status_code == 500
+
+    mock_httpx_client.send.return_value = HttpxResponse(502)
+    for _ in range(2):
+        assert (await client.send(request)).status_code == 502
+
+    with pytest.raises(HTTPException) as exc_info:
+        await client.send(request)
+    assert exc_info.value.status_code == 503
+    assert mock_httpx_client.send.await_count == 5
+
+
+@pytest.mark.asyncio
+async def test_build_forward_request_keeps_path_under_environment():
+    """The forwarded path is always appended to the environment's facts path, even if it looks like a url."""
+    client = FactsClient()
+
+    mock_remote_config = MagicMock()
+    mock_remote_config.context = {"project_id": "proj1", "env_id": "env1"}
+
+    with (
+        patch("horizon.facts.client.get_remote_config", return_value=mock_remote_config),
+        patch("horizon.facts.client.get_env_api_key", return_value="test_api_key"),
+        patch.object(sidecar_config, "CONTROL_PLANE", "https://control-plane"),
+    ):
+        request = _make_request(headers={"authorization": "Bearer user_token"})
+        forward_request = await client.build_forward_request(request, "/users/user1")
+        assert str(forward_request.url) == "https://control-plane/v2/facts/proj1/env1/users/user1"
+
+        forward_request = await client.build_forward_request(request, "http://example.com/users")
+        assert forward_request.url.host == "control-plane"
+
+
+def test_convert_response_buffered_body_drops_upstream_encoding():
+    """Loaded responses are decoded, so they must not be labelled with the upstream content-encoding."""
+    body = b'{"key": "user1"}'
+    compressed = gzip.compress(body)
+    response = HttpxResponse(
+        200, headers={"content-encoding": "gzip", "content-length": str(len(compressed))}, content=compressed
+    )
+    response.read()
+
+    converted = FactsClient.convert_response(response)
+
+    assert converted.body == body
+    assert "content-encoding" not in converted.headers
+    assert converted.headers["content-length"] == str(len(body))
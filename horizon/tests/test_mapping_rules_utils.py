@@ -0,0 +1,110 @@
+import json
+
+from horizon.enforcer.utils.mapping_rules_utils import MappingRulesUtils
+
+
+def _load(rules: list[dict]):
+    _, mapping_rules = MappingRulesUtils.load_mapping_rules(json.dumps({"result": {"all": rules}}).encode())
+    return mapping_rules
+
+
+def test_extract_mapping_rule_prefers_highest_priority():
+    mapping_rules = _load(
+        [
+            {"url": "https://api.example.com/users/{id}", "http_method": "get", "resource": "low", "action": "read"},
+            {
+                "url": "https://api.example.com/users/{id}",
+                "http_method": "GET",
+                "resource": "high",
+                "action": "read",
+                "priority": 10,
+            },
+            {
+                "url": "https://api.example.com/users/{id}",
+                "http_method": "get",
+                "resource": "high-second",
+                "action": "read",
+                "priority": 10,
+            },
+        ]
+    )
+
+    rule = MappingRulesUtils.extract_mapping_rule_by_request(mapping_rules, "GET", "https://api.example.com/users/1")
+
+    assert rule is not None
+    # equal priorities keep the order returned by OPA
+    assert rule.resource == "high"
+
+
+def test_extract_mapping_rule_no_match():
+    mapping_rules = _load(
+        [{"url": "https://api.example.com/users/{id}", "http_method": "post", "resource": "users", "action": "create"}]
+    )
+
+    assert (
+        MappingRulesUtils.extract_mapping_rule_by_request(mapping_rules, "get", "https://api.example.com/users/1")
+        is None
+    )
+    assert (
+        MappingRulesUtils.extract_mapping_rule_by_request(mapping_rules, "post", "https://api.example.com/users")
+        is None
+    )
+
+
+def test_extract_attributes_from_url_templates():
+    mapping_rules = _load(
+        [
+            {
+                "url": "https://api.example.com/orgs/{org}/users?role={role}&active=true",
+                "http_method": "get",
+                "resource": "users",
+                "action": "list",
+            }
+        ]
+    )
+    url = "https://api.example.com/orgs/acme/users?active=true&role=admin"
+
+    rule = MappingRulesUtils.extract_mapping_rule_by_request(mapping_rules, "get", url)
+
+    assert rule is not None
+    assert MappingRulesUtils.extract_attributes_from_url(rule, url) == {"org": "acme"}
+    assert MappingRulesUtils.extract_attributes_from_query_params(rule, url) == {"role": "admin"}
+    assert (
+        MappingRulesUtils.extract_mapping_rule_by_request(
+            mapping_rules, "get", "https://api.example.com/orgs/acme/users?active=false&role=admin"
+        )
+        is None
+    )
+
+
+def test_extract_mapping_rule_regex_rules_match_any_path_length():
+    mapping_rules = _load(
+        [
+            {"url": "https://api.example.com/users/{id}", "http_method": "get", "resource": "user", "action": "read"},
+            {
+                "url": r"^https://api\.example\.com/.*$",
+                "url_type": "regex",
+                "http_method": "get",
+                "resource": "any",
+                "action": "read",
+            },
+        ]
+    )
+
+    rule = MappingRulesUtils.extract_mapping_rule_by_request(mapping_rules, "get", "https://api.example.com/users/1")
+    assert rule is not None
+    assert rule.resource == "user"
+    rule = MappingRulesUtils.extract_mapping_rule_by_request(mapping_rules, "get", "https://api.example.com/a/b/c")
+    assert rule is not None
+    assert rule.resource == "any"
+
+
+def test_load_mapping_rules_reused_across_decision_ids():
+    rules = [{"url": "https://api.example.com/users", "http_method": "get", "resource": "users", "action": "list"}]
+
+    first = MappingRulesUtils.load_mapping_rules(json.dumps({"decision_id": "1", "result": {"all": rules}}).encode())
+    second = MappingRulesUtils.load_mapping_rules(json.dumps({"decision_id": "2", "result": {"all": rules}}).encode())
+
+    # only the decision id differs, the parsed rules are reused
+    assert second is first
+    assert _load([{**rules[0], "resource": "other"}]) is not first[1]
@@ -0,0 +1,32 @@
+from unittest.mock import patch
+from uuid import uuid4
+
+from horizon.facts.opal_forwarder import create_data_source_entry
+from opal_common.fetcher.providers.http_fetch_provider import HttpFetcherConfig
+from opal_common.schemas.data import DataSourceEntry
+
+
+def test_create_data_source_entry_matches_validated_entry():
+    update_id = uuid4()
+    with (
+        patch("horizon.facts.opal_forwarder.get_opal_data_base_url", return_value="https://deltas/v2/opal_data/"),
+        patch("horizon.facts.opal_forwarder.get_opal_data_topic", return_value="client:data:policy_data"),
+    ):
+        entry = create_data_source_entry(
+            obj_type="users",
+            obj_id="5c5a3b9a-1f2e-4d6c-8b7a-0e9f8d7c6b5a",
+            obj_key="user1",
+            authorization_header="Bearer token",
+            update_id=update_id,
+        )
+
+    assert entry == DataSourceEntry(
+        url="https://deltas/v2/opal_data/users/5c5a3b9a1f2e4d6c8b7a0e9f8d7c6b5a",
+        data=None,
+        dst_path="users/user1",
+        save_method="PUT",
+        topics=["client:data:policy_data"],
+        config=HttpFetcherConfig(
+            headers={"Authorization": "Bearer token", "X-Permit-Update-Id": update_id.hex},
+        ).dict(),
+    )